@@ -1,24 +1,152 @@
-from discord import SyncWebhook, File
-from typing import List
+from typing import List, Optional
+from contextlib import ExitStack
+import aiohttp
+import asyncio
+import json
 import os
 from dotenv import load_dotenv
 
 
 WEBHOOK_URL = os.getenv("WEBHOOK_URL_DISCORD")
 
+# Discord webhook limits for a single message
+MAX_FILES_PER_MESSAGE = 10
+MAX_BYTES_PER_MESSAGE = 10 * 1024 * 1024
+
+
+def pack_attachments(
+        list_files: List[str],
+        max_files: int = MAX_FILES_PER_MESSAGE,
+        max_bytes: int = MAX_BYTES_PER_MESSAGE
+) -> List[List[str]]:
+    """
+    Groups file paths into batches that respect the Discord attachment limits.
+
+    The original order of the files is kept, so the notes arrive in the same order they were created.
+    Only the file sizes are read here, the files themselves are opened when their batch is sent.
+
+    Args:
+        list_files (List[str]): Paths of the files to send.
+        max_files (int): Maximum number of attachments per message. Default: 10.
+        max_bytes (int): Maximum total size in bytes of the attachments per message. Default: 10 MiB.
+
+    Returns:
+        List[List[str]]: The batches of file paths, one per message.
+    """
+    batches: List[List[str]] = []
+    current_batch: List[str] = []
+    current_size = 0
+
+    for file_path in list_files:
+        file_size = os.path.getsize(file_path)
+        if file_size > max_bytes:
+            raise ValueError(f"File too large for Discord ({file_size} bytes): {file_path}")
+
+        if current_batch and (len(current_batch) >= max_files or current_size + file_size > max_bytes):
+            batches.append(current_batch)
+            current_batch = []
+            current_size = 0
+
+        current_batch.append(file_path)
+        current_size += file_size
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
+
 
 class DiscordSender:
     def __init__(self, webhook_url=WEBHOOK_URL):
-        self.webhook = SyncWebhook.from_url(webhook_url)
+        self.webhook_url = webhook_url
+
+    async def send_files(
+            self,
+            content: str,
+            list_files: List[str],
+            max_attempts: int = 5,
+            backoff: float = 1.0
+    ) -> None:
+        """
+        Sends the files to the webhook, split in as many messages as the attachment limits require.
+
+        The message content goes with the first batch only. Each file is opened just before its batch is
+        uploaded and streamed from disk, instead of keeping every file open for the whole delivery.
+
+        Args:
+            content (str): The message text.
+            list_files (List[str]): Paths of the files to attach.
+            max_attempts (int): Maximum number of attempts per message. Default: 5.
+            backoff (float): Base delay in seconds for the exponential backoff. Default: 1.0.
+        """
+        batches = pack_attachments(list_files)
+
+        async with aiohttp.ClientSession() as session:
+            for index, batch in enumerate(batches):
+                await self._post_batch(
+                    session,
+                    content if index == 0 else None,
+                    batch,
+                    max_attempts,
+                    backoff
+                )
+
+    async def _post_batch(
+            self,
+            session: aiohttp.ClientSession,
+            content: Optional[str],
+            batch: List[str],
+            max_attempts: int,
+            backoff: float
+    ) -> None:
+        payload = {"content": content} if content else {}
+
+        for attempt in range(max_attempts):
+            with ExitStack() as stack:
+                # The form is rebuilt on every attempt, the file streams are consumed by the previous one
+                form = aiohttp.FormData()
+                form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+                for position, file_path in enumerate(batch):
+                    form.add_field(
+                        f"files[{position}]",
+                        stack.enter_context(open(file_path, "rb")),
+                        filename=os.path.basename(file_path),
+                        content_type="application/octet-stream"
+                    )
+
+                try:
+                    async with session.post(self.webhook_url, data=form) as response:
+                        if response.status < 400:
+                            return
+
+                        if response.status == 429:
+                            delay = _retry_after(response, backoff * 2 ** attempt)
+                        elif response.status >= 500:
+                            delay = backoff * 2 ** attempt
+                        else:
+                            response.raise_for_status()
+
+                        error = f"Discord returned {response.status}"
+                except aiohttp.ClientResponseError:
+                    # 4xx other than 429, retrying would not change the answer
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    delay = backoff * 2 ** attempt
+                    error = f"Error sending to Discord: {e!r}"
+
+            if attempt == max_attempts - 1:
+                print(f"Attempt {attempt + 1}/{max_attempts}: {error}")
+                break
 
-    def mess_with_files(self, content: str, files: List[File]):
-        self.webhook.send(content=content, files=files)
+            print(f"Attempt {attempt + 1}/{max_attempts}: {error}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
 
-    @staticmethod
-    def open_files(list_files: List[str]) -> List[File]:
-        files_contents: List[File] = []
+        raise RuntimeError(f"Failed to send {len(batch)} file(s) to Discord after {max_attempts} attempts.")
 
-        for file_path in list_files:
-            files_contents.append(File(file_path, filename=file_path.split("/")[-1]))
 
-        return files_contents
\ No newline at end of file
+def _retry_after(response: aiohttp.ClientResponse, default: float) -> float:
+    # Discord sends the wait time in seconds, possibly fractional
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
@@ -1,5 +1,9 @@
 import subprocess
 import os
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 
 """
     OBS:
@@ -7,7 +11,11 @@ import os
     otimizar o tempo de download e instalação de dependências, já que baixei para transformar o vídeo em áudio wav.
 """
 
-def fragment_audio(input_file, output_folder, segment_duration=150):
+# Maximum difference, in seconds, between the expected and the probed duration of a fragment
+DURATION_TOLERANCE = 0.5
+
+
+def fragment_audio(input_file, output_folder, segment_duration=150, sample_rate: Optional[int] = None):
     try:
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
@@ -17,12 +25,131 @@ def fragment_audio(input_file, output_folder, segment_duration=150):
             '-i', input_file,  # input file
             '-f', 'segment',  # specify segmenting mode
             '-segment_time', str(segment_duration),  # segment time in seconds
-            '-c', 'copy',  # copy the codec, no re-encoding
+            *_codec_options(sample_rate),
             os.path.join(output_folder, 'output%03d.wav')  # output files
         ]
 
-        subprocess.run(command)
+        subprocess.run(command, check=True)
         return True
     except Exception as e:
         print(f"Erro ao fragmentar o áudio: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def probe_duration(input_file: str) -> float:
+    """
+    Returns the duration of a media file in seconds, using ffprobe.
+
+    Args:
+        input_file (str): Path to the media file.
+
+    Returns:
+        float: The duration in seconds.
+    """
+    command = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        input_file
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+
+    return float(result.stdout.strip())
+
+
+def fragment_audio_parallel(
+        input_file: str,
+        output_folder: str,
+        segment_duration: int = 150,
+        sample_rate: Optional[int] = None,
+        workers: Optional[int] = None
+) -> List[Dict[str, object]]:
+    """
+    Splits the audio in fragments, extracting the time ranges concurrently.
+
+    The input is probed once, and each fragment is extracted by its own ffmpeg process with -ss/-t, so a
+    re-encode (e.g. resampling) uses every core instead of one. Each output is checked against the expected
+    duration, and a manifest.json with the fragments is written to the output folder.
+
+    Args:
+        input_file (str): Path to the audio file.
+        output_folder (str): Folder where the fragments are saved.
+        segment_duration (int): Duration of each fragment in seconds. Default: 150.
+        sample_rate (Optional[int]): Resample the fragments to this rate. Default: None (copy the codec).
+        workers (Optional[int]): Number of ffmpeg processes at the same time. Default: number of cores.
+
+    Returns:
+        List[Dict[str, object]]: The manifest, one entry per fragment with file, start and duration.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    total_duration = probe_duration(input_file)
+
+    # A remainder shorter than the tolerance is merged into the last fragment instead of becoming its own
+    count = max(1, math.ceil((total_duration - DURATION_TOLERANCE) / segment_duration))
+    ranges = [(index * segment_duration, segment_duration) for index in range(count - 1)]
+    ranges.append(((count - 1) * segment_duration, total_duration - (count - 1) * segment_duration))
+
+    def extract(index: int) -> Dict[str, object]:
+        start, duration = ranges[index]
+        return _extract_fragment(
+            input_file,
+            os.path.join(output_folder, f'output{index:03d}.wav'),
+            start,
+            duration,
+            sample_rate
+        )
+
+    # The work happens in the ffmpeg processes, the threads only wait for them
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        manifest = list(executor.map(extract, range(len(ranges))))
+
+    with open(os.path.join(output_folder, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+    return manifest
+
+
+def _extract_fragment(
+        input_file: str,
+        output_file: str,
+        start: float,
+        duration: float,
+        sample_rate: Optional[int]
+) -> Dict[str, object]:
+    command = [
+        'ffmpeg',
+        '-y',
+        '-v', 'error',
+        '-ss', f'{start:.3f}',  # seek before the input, so ffmpeg jumps straight to the range
+        '-t', f'{duration:.3f}',
+        '-i', input_file,
+        *_codec_options(sample_rate),
+        output_file
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed on {output_file}: {result.stderr.strip()}")
+
+    if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+        raise RuntimeError(f"Fragment not created: {output_file}")
+
+    fragment_duration = probe_duration(output_file)
+    if abs(fragment_duration - duration) > DURATION_TOLERANCE:
+        raise RuntimeError(
+            f"Fragment {output_file} has {fragment_duration:.3f}s, expected {duration:.3f}s"
+        )
+
+    return {
+        'file': os.path.basename(output_file),
+        'start': round(start, 3),
+        'duration': round(fragment_duration, 3)
+    }
+
+
+def _codec_options(sample_rate: Optional[int]) -> List[str]:
+    if sample_rate is None:
+        return ['-c', 'copy']  # copy the codec, no re-encoding
+    return ['-ar', str(sample_rate)]  # re-encode with the new sample rate
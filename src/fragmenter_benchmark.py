@@ -0,0 +1,80 @@
+"""
+Benchmark of the fragmenter: single ffmpeg process (fragment_audio) vs. parallel extraction
+(fragment_audio_parallel).
+
+Generates a synthetic WAV with the local ffmpeg and times both paths, copying the codec and resampling.
+
+Usage:
+    python fragmenter_benchmark.py [--minutes 60] [--sample-rate 16000] [--workers N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Callable
+
+from fragmenter import fragment_audio, fragment_audio_parallel
+
+
+def generate_wav(output_file: str, minutes: int) -> None:
+    command = [
+        'ffmpeg',
+        '-y',
+        '-v', 'error',
+        '-f', 'lavfi',
+        '-i', f'sine=frequency=440:sample_rate=48000:duration={minutes * 60}',
+        '-ac', '2',
+        output_file
+    ]
+    subprocess.run(command, check=True)
+
+
+def timed(function: Callable[[], object], output_folder: str) -> float:
+    # Each run starts from an empty folder
+    shutil.rmtree(output_folder, ignore_errors=True)
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    fragments = len([f for f in os.listdir(output_folder) if f.endswith(".wav")]) if os.path.exists(output_folder) else 0
+    # fragment_audio reports errors by returning False, a failed run would otherwise be timed as a fast one
+    if result is False or fragments == 0:
+        raise RuntimeError("Fragmentation failed, the run is not timed")
+    print(f"    {elapsed:7.2f}s  ({fragments} fragments)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the single-process and the parallel fragmenter.")
+    parser.add_argument("--minutes", type=int, default=60, help="length of the synthetic audio")
+    parser.add_argument("--segment", type=int, default=150, help="fragment duration in seconds")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="sample rate of the resampling runs")
+    parser.add_argument("--workers", type=int, default=None, help="parallel ffmpeg processes (default: cores)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, "input.wav")
+        output_folder = os.path.join(temp_dir, "fragments")
+        print(f"Generating {args.minutes} min of audio...")
+        generate_wav(input_file, args.minutes)
+        print(f"Cores: {os.cpu_count()}, workers: {args.workers or os.cpu_count()}")
+
+        for label, sample_rate in (("copy", None), (f"resample to {args.sample_rate} Hz", args.sample_rate)):
+            print(f"[{label}]")
+            print("  single process:")
+            single = timed(
+                lambda: fragment_audio(input_file, output_folder, args.segment, sample_rate),
+                output_folder
+            )
+            print("  parallel:")
+            parallel = timed(
+                lambda: fragment_audio_parallel(input_file, output_folder, args.segment, sample_rate, args.workers),
+                output_folder
+            )
+            print(f"  speed-up: {single / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Import-time report for the pipeline stages.
+
+Starts a fresh interpreter with `python -X importtime`, imports main.py and the modules of the selected
+stages, and summarizes the timings the interpreter writes to stderr. Used to keep the cold start of
+partial runs (e.g. `--from deliver`) low.
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+
+class ImportTiming(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parses the lines written by `-X importtime`.
+
+    Args:
+        output (str): The stderr of the interpreter.
+
+    Returns:
+        List[ImportTiming]: One entry per imported module, in the order the interpreter reported them.
+    """
+    timings: List[ImportTiming] = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+
+        try:
+            self_us = int(fields[0])
+            cumulative_us = int(fields[1])
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+
+        # Nested imports are indented two spaces per level after the separator
+        raw_name = fields[2].rstrip()
+        stripped_name = raw_name.lstrip()
+        depth = (len(raw_name) - len(stripped_name) - 1) // 2
+        timings.append(ImportTiming(stripped_name, self_us, cumulative_us, depth))
+
+    return timings
+
+
+def import_time_report(modules: List[str], top: int = 10) -> str:
+    """
+    Measures the import time of main.py plus the given modules in a new interpreter.
+
+    Args:
+        modules (List[str]): Project modules to import after main.py.
+        top (int): Number of top-level imports to list. Default: 10.
+
+    Returns:
+        str: The report, with the total time and the slowest top-level imports.
+    """
+    # Plain import statements: importlib.import_module bypasses the interpreter's import-time hook
+    code = "import main\n" + "".join(f"import {module}\n" for module in modules)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Error importing the stage modules: {result.stderr.strip().splitlines()[-1]}")
+
+    top_level = [timing for timing in parse_importtime(result.stderr) if timing.depth == 0]
+    total_us = sum(timing.cumulative_us for timing in top_level)
+
+    lines = [
+        f"Modules: main{''.join(', ' + module for module in modules)}",
+        f"Total import time: {total_us / 1000:.1f} ms ({len(top_level)} top-level imports)",
+        f"Slowest {min(top, len(top_level))} top-level imports:"
+    ]
+    for timing in sorted(top_level, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.name}")
+
+    return "\n".join(lines)
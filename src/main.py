@@ -1,23 +1,14 @@
 import time
-from http.client import responses
-from lib2to3.fixes.fix_input import context
-
-from scraper import scraper_main
-from downloader import download_video
-from fragmenter import fragment_audio
-from transcriber import transcribe_audios
-from google_drive_service import GoogleDriveManager, FOLDER_ID, SCOPES, SERVICE_ACCOUNT_FILE
-from gemini import Gemini, save_response
-from discord_sender import DiscordSender
-from utils import format_string
+import argparse
 import asyncio
 import json
 import os
 from dotenv import load_dotenv
-from typing import List, Dict
-from discord import File
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 
+# The heavy dependencies (playwright, yt_dlp, speech_recognition, googleapiclient, google.generativeai, aiohttp)
+# are imported inside the stage that needs them, so a partial run only pays for its own stages.
 
 NOTES_NAMES = ["summarize",
                "relevant_topics",
@@ -26,8 +17,50 @@ NOTES_NAMES = ["summarize",
                "reference_relevant_topics"
                ]
 
+STAGES = ["scrape",
+          "download",
+          "fragment",
+          "transcribe",
+          "drive",
+          "notes",
+          "deliver",
+          "cleanup"
+          ]
+
+# Project modules each stage imports, used by the import-time report
+STAGE_MODULES: Dict[str, List[str]] = {
+    "scrape": ["scraper"],
+    "download": ["downloader"],
+    "fragment": ["fragmenter"],
+    "transcribe": ["transcriber"],
+    "drive": ["google_drive_service", "utils"],
+    "notes": ["gemini"],
+    "deliver": ["google_drive_service", "discord_sender"],
+    "cleanup": []
+}
+
+STATE_FILE = "../data/run_state.json"
+
+# Keys of the run state each stage writes and reads
+STAGE_PRODUCES: Dict[str, List[str]] = {
+    "scrape": ["link", "class_name"],
+    "drive": ["folder_id"],
+    "notes": ["class_theme", "class_date"]
+}
+STAGE_REQUIRES: Dict[str, List[str]] = {
+    "download": ["link"],
+    "drive": ["class_name"],
+    "deliver": ["class_name", "class_date", "class_theme", "folder_id"]
+}
+
+
+class MissingStateError(Exception):
+    pass
+
 # 1 - Step Scraper
 def scraper():
+    from scraper import scraper_main
+
     link, class_name = asyncio.run(scraper_main())
 
     return link, class_name
@@ -35,6 +68,8 @@ def scraper():
 # 2 - Download the file
 
 def download_file(link):
+    from downloader import download_video
+
     try:
         download_video(link)
         return True
@@ -44,16 +79,16 @@ def download_file(link):
 
 # 3 - Fragment the audio
 def fragment(input_file, output_folder, segment_duration=150):
-    try:
-        fragment_audio(input_file, output_folder, segment_duration)
-        return True
-    except Exception as e:
-        print(f"Erro ao fragmentar o áudio: {e}")
-        return False
+    from fragmenter import fragment_audio_parallel
+
+    # No try/except here: a missing or broken fragment must stop the run before transcribe reads the folder
+    return fragment_audio_parallel(input_file, output_folder, segment_duration)
 
 
 # 4 - Transcribe the audio
 def transcribe():
+    from transcriber import transcribe_audios
+
     try:
         transcribe_audios("../data/fragments/")
         return True
@@ -64,6 +99,9 @@ def transcribe():
 # 4.1 - Create the folder class in Google Drive
 
 def create_new_folder(class_name):
+    from google_drive_service import GoogleDriveManager, FOLDER_ID, SCOPES, SERVICE_ACCOUNT_FILE
+    from utils import format_string
+
     gd = GoogleDriveManager(SERVICE_ACCOUNT_FILE, SCOPES)
 
     folder_number = gd.list_folders_in_folder(FOLDER_ID)
@@ -75,18 +113,35 @@ def create_new_folder(class_name):
 
 # 4.2 - Save the transcription in Google Drive
 def save_in_google_drive(file_name, file_path: str, folder_id: str) -> None:
+    from google_drive_service import GoogleDriveManager, SCOPES, SERVICE_ACCOUNT_FILE
+
     file_name = file_name.split(".")[0]
     gd = GoogleDriveManager(SERVICE_ACCOUNT_FILE, SCOPES)
     gd.upload_file_to_folder(file_name, file_path, folder_id)
 
+def load_config_prompt() -> Dict[str, Dict[str, str]]:
+    with open("../data/config_prompt.json", "r") as file:
+        return json.load(file)
+
+
+def notes_files(config_prompt: Dict[str, Dict[str, str]]) -> List[Tuple[str, str]]:
+    # (name in Google Drive, local path) of each note
+    return [
+        (config_prompt[note]["file_name_pt"], f"../data/texts/{config_prompt[note]['file_name']}")
+        for note in NOTES_NAMES
+    ]
+
 # 5 - Summarize,  the transcription
 class UseGemini:
     def __init__(self):
+        from gemini import Gemini
+
         self.gemini = Gemini()
-        with open("../data/config_prompt.json", "r") as file:
-            self.config_prompt = json.load(file)
+        self.config_prompt = load_config_prompt()
 
     def create_notes(self, file_path: str, output_file: str, prompt: str):
+        from gemini import save_response
+
         response = self.gemini.prompt_with_text(file_path, prompt)
         save_response(response, "../data/texts/" + output_file)
 
@@ -115,77 +170,182 @@ def delete_files(path_files: str):
 
 
 
-def send_to_discord(list_files: List[str], message: str):
-    dcs = DiscordSender()
-    # Load the notes
-    opened_files: List[File] = dcs.open_files(list_files)
+async def send_to_discord(list_files: List[str], message: str):
+    from discord_sender import DiscordSender
 
-    dcs.mess_with_files(
+    dcs = DiscordSender()
+    # The notes are opened batch by batch while sending
+    await dcs.send_files(
         content=message,
-        files=opened_files
+        list_files=list_files
     )
 
-def app():
-    # 1 - Step Scraper
-    load_dotenv()
-    link, class_name = scraper()
-    print(link, class_name)
-    # 2 - Download the file
-    download_file(link)
-    # 3 - Fragment the audio
-    fragment("../data/audio/video.wav", "../data/fragments/")
-    # 4 - Transcribe the audio
-    transcribe()
-    # 4.1 - Create the folder class in Google Drive
-    folder_id = create_new_folder(class_name)
-    # 4.2 - Save the transcription in Google Drive
-    save_in_google_drive("transcription.txt","../data/texts/transcription.txt", folder_id)
-    # 5 - Generate the notes from the transcription
-    gemini = UseGemini()
-    path_texts_list: List[str] = []
-    for note in NOTES_NAMES:
-        print(f"Creating note: {note}")
-        gemini.create_notes(
-            gemini.config_prompt[note]["origin_file"],
-            gemini.config_prompt[note]["file_name"],
-            gemini.config_prompt[note]["prompt"]
-        )
-        print(f"Created note: {note}")
-        # 6 - Save the notes in Google Drive
-        save_in_google_drive(
-            gemini.config_prompt[note]["file_name_pt"],
-            f"../data/texts/{gemini.config_prompt[note]['file_name']}",
-            folder_id
-        )
-        path_texts_list.append(f"../data/texts/{gemini.config_prompt[note]['file_name']}")
-        print(f"Saved note on Google Drive: {note}")
-        time.sleep(60)
-    # 7 - Send the notes to Discord
-    class_theme = gemini.create_class_theme("transcription.txt")
-    #TODO: Trocar aqui antes de subir o código pro Git
-    class_date = datetime.now() - timedelta(days=1)
-    message = format_message(
-        class_date.strftime("%d/%m/%Y"),
-        class_name,
-        class_theme
+# 6/7 - Save the notes in Google Drive while sending them to Discord
+async def deliver_notes(notes: List[Tuple[str, str]], folder_id: str, message: str):
+    drive_uploads = [
+        asyncio.to_thread(save_in_google_drive, file_name, file_path, folder_id)
+        for file_name, file_path in notes
+    ]
+    # Wait for every upload to settle, so a Discord failure does not hide which Drive uploads finished
+    results = await asyncio.gather(
+        *drive_uploads,
+        send_to_discord([file_path for _, file_path in notes], message),
+        return_exceptions=True
     )
 
-    send_to_discord(path_texts_list, message)
-
-    # Delete the files from the text folder
-    folders_path = ["../data/texts/", "../data/fragments/", "../data/audio/"]
-    for folder in folders_path:
-        for file in os.listdir(folder):
-            os.remove(folder + file)
-
+    deliveries = [f"Google Drive: {file_name}" for file_name, _ in notes] + ["Discord"]
+    failures: List[str] = []
+    for delivery, result in zip(deliveries, results):
+        if isinstance(result, BaseException):
+            print(f"Erro ao enviar ({delivery}): {result!r}")
+            failures.append(delivery)
+        else:
+            print(f"Enviado ({delivery})")
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} of {len(deliveries)} deliveries failed: {', '.join(failures)}")
+
+def load_state() -> Dict[str, str]:
+    # Values produced by earlier runs (link, class name, Drive folder...), so a run can start at any stage
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, "r") as file:
+        return json.load(file)
+
+
+def save_state(state: Dict[str, str]) -> None:
+    with open(STATE_FILE, "w") as file:
+        json.dump(state, file)
+
+
+def run_stage(stage: str, state: Dict[str, str]) -> None:
+    if stage == "scrape":
+        # 1 - Step Scraper
+        state["link"], state["class_name"] = scraper()
+        print(state["link"], state["class_name"])
+    elif stage == "download":
+        # 2 - Download the file
+        download_file(state["link"])
+    elif stage == "fragment":
+        # 3 - Fragment the audio
+        fragment("../data/audio/video.wav", "../data/fragments/")
+    elif stage == "transcribe":
+        # 4 - Transcribe the audio
+        transcribe()
+    elif stage == "drive":
+        # 4.1 - Create the folder class in Google Drive
+        state["folder_id"] = create_new_folder(state["class_name"])
+        # 4.2 - Save the transcription in Google Drive
+        save_in_google_drive("transcription.txt", "../data/texts/transcription.txt", state["folder_id"])
+    elif stage == "notes":
+        # 5 - Generate the notes from the transcription
+        gemini = UseGemini()
+        for note in NOTES_NAMES:
+            print(f"Creating note: {note}")
+            gemini.create_notes(
+                gemini.config_prompt[note]["origin_file"],
+                gemini.config_prompt[note]["file_name"],
+                gemini.config_prompt[note]["prompt"]
+            )
+            print(f"Created note: {note}")
+            time.sleep(60)
+        state["class_theme"] = gemini.create_class_theme("transcription.txt")
+        #TODO: Trocar aqui antes de subir o código pro Git
+        class_date = datetime.now() - timedelta(days=1)
+        state["class_date"] = class_date.strftime("%d/%m/%Y")
+    elif stage == "deliver":
+        # 6/7 - Save the notes in Google Drive and send them to Discord
+        message = format_message(
+            state["class_date"],
+            state["class_name"],
+            state["class_theme"]
+        )
+        asyncio.run(deliver_notes(notes_files(load_config_prompt()), state["folder_id"], message))
+    elif stage == "cleanup":
+        # 8 - Delete the files from the text, fragments and audio folders
+        folders_path = ["../data/texts/", "../data/fragments/", "../data/audio/"]
+        for folder in folders_path:
+            for file in os.listdir(folder):
+                os.remove(folder + file)
+        if os.path.exists(STATE_FILE):
+            os.remove(STATE_FILE)
+
+
+def check_state(stages: List[str], state: Dict[str, str]) -> None:
+    # Fails before running anything if a stage needs a value that neither the saved state nor an earlier
+    # stage of this run provides
+    available = {key for key, value in state.items() if value is not None}
+
+    for stage in stages:
+        missing = [key for key in STAGE_REQUIRES.get(stage, []) if key not in available]
+        if missing:
+            producers = [
+                producer for producer in STAGES
+                if any(key in STAGE_PRODUCES.get(producer, []) for key in missing)
+            ]
+            raise MissingStateError(
+                f"Stage '{stage}' needs {', '.join(missing)}, missing from {STATE_FILE}. "
+                f"Run the stage(s) {', '.join(producers)} first, e.g. --from {producers[0]}."
+            )
+        available.update(STAGE_PRODUCES.get(stage, []))
+
+
+def app(first_stage: str = STAGES[0], last_stage: str = STAGES[-1]) -> str:
+    load_dotenv()
+    state = load_state()
+    stages = STAGES[STAGES.index(first_stage):STAGES.index(last_stage) + 1]
+    # Values from this stage onwards belong to the class being processed now, not to a previous run
+    for stage in STAGES[STAGES.index(first_stage):]:
+        for key in STAGE_PRODUCES.get(stage, []):
+            state.pop(key, None)
+    check_state(stages, state)
+
+    for stage in stages:
+        print(f"Running stage: {stage}")
+        run_stage(stage, state)
+        if stage != "cleanup":
+            save_state(state)
 
     # return a message in CLI in format json to be used in N8N (Temporarily)
     return json.dumps({
-        "class_name": class_name,
-        "class_date": class_date.strftime("%d/%m/%Y"),
-        "class_theme": class_theme
+        "class_name": state.get("class_name"),
+        "class_date": state.get("class_date"),
+        "class_theme": state.get("class_theme")
     })
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download, transcribe and take notes of the MBA classes.")
+    parser.add_argument("--from", dest="first_stage", choices=STAGES, default=STAGES[0],
+                        help="first stage to run (default: %(default)s)")
+    parser.add_argument("--to", dest="last_stage", choices=STAGES, default=STAGES[-1],
+                        help="last stage to run (default: %(default)s)")
+    parser.add_argument("--import-report", action="store_true",
+                        help="print the import time of the selected stages instead of running them")
+    args = parser.parse_args(argv)
+
+    if STAGES.index(args.first_stage) > STAGES.index(args.last_stage):
+        parser.error(f"--from {args.first_stage} comes after --to {args.last_stage}")
+
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    stages = STAGES[STAGES.index(args.first_stage):STAGES.index(args.last_stage) + 1]
+
+    if args.import_report:
+        from import_report import import_time_report
+
+        modules = [module for stage in stages for module in STAGE_MODULES[stage]]
+        print(import_time_report(list(dict.fromkeys(modules))))
+        return
+
+    try:
+        print(app(args.first_stage, args.last_stage))
+    except MissingStateError as e:
+        raise SystemExit(f"Error: {e}")
+
+
 if __name__ == "__main__":
-    app()
+    main()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+from aiohttp import web
+
+import discord_sender
+from discord_sender import DiscordSender, pack_attachments
+
+
+async def _send_to_stub(list_files: List[str], content: str) -> List[Dict[str, object]]:
+    posts: List[Dict[str, object]] = []
+
+    async def webhook(request: web.Request) -> web.Response:
+        payload = None
+        files = []
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name == "payload_json":
+                payload = json.loads(await part.text())
+            else:
+                files.append(part.filename)
+                await part.read()
+        posts.append({"payload": payload, "files": files})
+
+        # Rate limit the first post only
+        if len(posts) == 1:
+            return web.json_response({"retry_after": 0.2}, status=429, headers={"Retry-After": "0.2"})
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/api/webhooks/1/token", webhook)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        sender = DiscordSender(f"http://{host}:{port}/api/webhooks/1/token")
+        await sender.send_files(content, list_files, backoff=0.01)
+    finally:
+        await runner.cleanup()
+
+    return posts
+
+
+def _write_notes(tmp_path, count: int) -> List[str]:
+    list_files = []
+    for index in range(count):
+        note = tmp_path / f"note{index:02d}.md"
+        note.write_text(f"# Note {index}\n")
+        list_files.append(str(note))
+    return list_files
+
+
+def test_send_files_batches_and_retries_after_429(tmp_path, monkeypatch):
+    list_files = _write_notes(tmp_path, 12)
+    delays: List[float] = []
+    sleep = asyncio.sleep
+
+    async def recording_sleep(delay, *args, **kwargs):
+        # aiohttp also yields with sleep(0) while closing connections
+        if delay:
+            delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(discord_sender.asyncio, "sleep", recording_sleep)
+
+    posts = asyncio.run(_send_to_stub(list_files, "Resumo da aula"))
+
+    # The wait comes from Retry-After, not from the 0.01s backoff
+    assert delays == [0.2]
+
+    # 429 on the first batch, the same batch again, then the remaining 2 notes
+    assert len(posts) == 3
+    assert posts[0] == posts[1]
+    assert posts[1]["files"] == [f"note{index:02d}.md" for index in range(10)]
+    assert posts[2]["files"] == ["note10.md", "note11.md"]
+    assert posts[1]["payload"] == {"content": "Resumo da aula"}
+    assert posts[2]["payload"] == {}
+
+
+def test_pack_attachments_respects_size_limit(tmp_path):
+    list_files = _write_notes(tmp_path, 4)
+    size = len("# Note 0\n")
+
+    assert pack_attachments(list_files, max_bytes=2 * size) == [list_files[:2], list_files[2:]]
+
+
+def test_send_files_retries_connection_errors(tmp_path):
+    list_files = _write_notes(tmp_path, 1)
+    # Nothing listens on port 9 (discard), every attempt fails to connect
+    sender = DiscordSender("http://127.0.0.1:9/api/webhooks/1/token")
+
+    with pytest.raises(RuntimeError, match="after 3 attempts"):
+        asyncio.run(sender.send_files("Resumo da aula", list_files, max_attempts=3, backoff=0.01))
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+from typing import Dict, List
+
+import pytest
+
+import fragmenter
+from fragmenter import fragment_audio_parallel
+
+
+def _fake_ffmpeg(
+        monkeypatch,
+        total_duration: float,
+        returncode: int = 0,
+        content: bytes = b"RIFF",
+        duration_error: float = 0.0
+) -> List[List[str]]:
+    # Replaces ffmpeg and ffprobe: each fragment gets `content` and reports the -t it was asked for
+    commands: List[List[str]] = []
+    durations: Dict[str, float] = {}
+
+    def run(command, **kwargs):
+        commands.append(command)
+        output_file = command[-1]
+        durations[output_file] = float(command[command.index("-t") + 1]) + duration_error
+        with open(output_file, "wb") as file:
+            file.write(content)
+        return subprocess.CompletedProcess(command, returncode, stdout="", stderr="Invalid data")
+
+    def probe_duration(input_file: str) -> float:
+        return durations.get(input_file, total_duration)
+
+    monkeypatch.setattr(fragmenter.subprocess, "run", run)
+    monkeypatch.setattr(fragmenter, "probe_duration", probe_duration)
+    return commands
+
+
+@pytest.mark.parametrize("total_duration, expected", [
+    (300.0, [(0, 150.0), (150, 150.0)]),
+    (300.3, [(0, 150.0), (150, 150.3)]),
+    (301.0, [(0, 150.0), (150, 150.0), (300, 1.0)]),
+    (100.0, [(0, 100.0)]),
+])
+def test_fragment_audio_parallel_splits_ranges(tmp_path, monkeypatch, total_duration, expected):
+    _fake_ffmpeg(monkeypatch, total_duration)
+
+    manifest = fragment_audio_parallel("video.wav", str(tmp_path), segment_duration=150, workers=2)
+
+    assert [(entry["start"], entry["duration"]) for entry in manifest] == expected
+    assert [entry["file"] for entry in manifest] == [f"output{index:03d}.wav" for index in range(len(expected))]
+
+
+def test_fragment_audio_parallel_writes_manifest(tmp_path, monkeypatch):
+    commands = _fake_ffmpeg(monkeypatch, 200.0)
+
+    manifest = fragment_audio_parallel("video.wav", str(tmp_path), segment_duration=150, sample_rate=16000)
+
+    with open(tmp_path / "manifest.json") as file:
+        assert json.load(file) == manifest == [
+            {"file": "output000.wav", "start": 0, "duration": 150.0},
+            {"file": "output001.wav", "start": 150, "duration": 50.0},
+        ]
+    assert all(command[command.index("-ar") + 1] == "16000" for command in commands)
+
+
+@pytest.mark.parametrize("returncode, content, duration_error, message", [
+    (1, b"RIFF", 0.0, "ffmpeg failed"),
+    (0, b"", 0.0, "Fragment not created"),
+    (0, b"RIFF", 2.0, "expected 150.000s"),
+])
+def test_fragment_audio_parallel_rejects_bad_fragments(
+        tmp_path, monkeypatch, returncode: int, content: bytes, duration_error: float, message: str
+):
+    _fake_ffmpeg(monkeypatch, 300.0, returncode, content, duration_error)
+
+    with pytest.raises(RuntimeError, match=message):
+        fragment_audio_parallel("video.wav", str(tmp_path), segment_duration=150)
+
+    assert not os.path.exists(tmp_path / "manifest.json")
@@ -0,0 +1,17 @@
+from import_report import ImportTiming, parse_importtime
+
+
+def test_parse_importtime_reads_values_and_depths():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     _json",
+        "import time:       850 |        970 |   json.decoder",
+        "import time:      1500 |       2470 | json",
+        "some other stderr line",
+    ])
+
+    assert parse_importtime(stderr) == [
+        ImportTiming("_json", 120, 120, 2),
+        ImportTiming("json.decoder", 850, 970, 1),
+        ImportTiming("json", 1500, 2470, 0),
+    ]
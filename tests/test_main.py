@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import main
+from main import MissingStateError, app, check_state, parse_args
+
+
+def test_check_state_names_the_stage_to_run_first():
+    with pytest.raises(MissingStateError, match="Run the stage\\(s\\) notes first"):
+        check_state(["deliver"], {"class_name": "Aula", "folder_id": "abc", "link": "https://example.com"})
+
+
+def test_check_state_accepts_keys_produced_earlier_in_the_run():
+    check_state(["transcribe", "drive", "notes", "deliver"], {"class_name": "Aula", "link": "https://example.com"})
+
+
+def test_parse_args_rejects_from_after_to():
+    with pytest.raises(SystemExit):
+        parse_args(["--from", "notes", "--to", "scrape"])
+
+
+def test_app_drops_state_of_the_stages_being_rerun(tmp_path, monkeypatch):
+    state_file = tmp_path / "run_state.json"
+    state_file.write_text(json.dumps({
+        "link": "https://example.com/old",
+        "class_name": "Aula antiga",
+        "folder_id": "old-folder",
+        "class_theme": "Tema antigo",
+        "class_date": "01/01/2024"
+    }))
+    seen_states = []
+    monkeypatch.setattr(main, "STATE_FILE", str(state_file))
+    monkeypatch.setattr(main, "run_stage", lambda stage, state: seen_states.append(dict(state)))
+
+    app("notes", "notes")
+
+    assert seen_states == [{"link": "https://example.com/old", "class_name": "Aula antiga", "folder_id": "old-folder"}]
+
+
+def test_app_stops_when_fragment_fails(tmp_path, monkeypatch):
+    state_file = tmp_path / "run_state.json"
+    state_file.write_text(json.dumps({"link": "https://example.com"}))
+    ran_transcribe = []
+
+    def broken_fragment(*args, **kwargs):
+        raise RuntimeError("Fragment not created: output001.wav")
+
+    monkeypatch.setattr(main, "STATE_FILE", str(state_file))
+    monkeypatch.setattr(main, "fragment", broken_fragment)
+    monkeypatch.setattr(main, "transcribe", lambda: ran_transcribe.append(True))
+
+    with pytest.raises(RuntimeError, match="Fragment not created"):
+        app("fragment", "transcribe")
+
+    assert ran_transcribe == []
+    assert json.loads(state_file.read_text()) == {"link": "https://example.com"}